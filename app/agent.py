@@ -219,9 +219,8 @@ class StyleBot:
     
     def _handle_product_inquiry(self, user_input: str) -> Dict[str, Any]:
         """Handle product-related questions"""
-        # Get relevant product information
-        context = self.rag_system.get_relevant_context(user_input)
-        product_results = self.rag_system.search_products(user_input)
+        # Get relevant product information in one batched retrieval pass
+        context, product_results = self.rag_system.get_context_and_products(user_input)
         
         # Build prompt
         prompt = PROMPT_TEMPLATES["product_inquiry"].format(
@@ -3,16 +3,84 @@ Generative Design Suggestions Module
 Handles creative design suggestions based on user preferences and style inputs.
 """
 
+import functools
 import random
+import re
 import logging
-from typing import List, Dict, Any, Optional
+from collections import deque
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
+import numpy as np
+
 from config import config, PROMPT_TEMPLATES
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Tokenizer for preference analysis (underscore keeps styles like "pop_art" whole)
+_TOKEN_RE = re.compile(r"[a-z_]+")
+
+# Word buckets for complexity/vibe detection; frozensets give O(1) membership
+_COMPLEXITY_WORDS = {
+    "low": frozenset(["simple", "minimal", "clean", "subtle"]),
+    "high": frozenset(["complex", "detailed", "intricate", "elaborate"]),
+}
+
+_VIBE_WORDS = {
+    "bold": frozenset(["bold", "loud", "striking", "dramatic"]),
+    "elegant": frozenset(["elegant", "sophisticated", "classy", "refined"]),
+    "playful": frozenset(["fun", "playful", "cute", "whimsical"]),
+}
+
+# Description building blocks; only the one chosen template is formatted
+_BASE_TEMPLATES = (
+    "A {vibe} {style} design featuring {theme_element} in {color_desc}",
+    "Picture a {style}-inspired {theme_element} design using {color_desc}",
+    "Imagine a {vibe} {pattern} pattern incorporating {theme_element} in {color_desc}",
+    "A {complexity}-complexity {style} design with {theme_element} elements in {color_desc}",
+)
+
+_STYLE_DETAILS = {
+    "geometric": " with clean, mathematical precision",
+    "organic": " with flowing, natural curves",
+    "vintage": " with classic, timeless appeal",
+    "grunge": " with a raw, edgy aesthetic",
+    "japanese": " with elegant Eastern influences",
+}
+
+_ROUGH_STYLES = frozenset(["vintage", "grunge"])
+
+
+def _print_method_rule(num_colors: int, complexity: str, rough_style: bool) -> str:
+    """Base rules for picking a print method; evaluated once per table cell"""
+    if num_colors <= 2 and complexity == "low":
+        return "screen printing"
+    if num_colors > 4 or complexity == "high":
+        return "digital printing"
+    if rough_style:
+        return "heat transfer"
+    return "screen printing"
+
+
+# Every (color bucket, complexity, style bucket) cell precomputed once;
+# color buckets are <=2 / 3-4 / >4, style buckets rough (vintage, grunge)
+# or other
+_PRINT_TABLE = {
+    (bucket, complexity, style): _print_method_rule(colors, complexity, style == "rough")
+    for bucket, colors in ((0, 1), (1, 3), (2, 5))
+    for complexity in ("low", "medium", "high")
+    for style in ("rough", "other")
+}
+
+_FINISHING_OPTIONS = (
+    ". This design would work beautifully with screen printing.",
+    ". Perfect for digital printing to capture all the color nuances.",
+    ". The design would look stunning with a subtle texture overlay.",
+    ". Consider adding a slight vintage wash effect for extra character.",
+    ". The design could be enhanced with metallic accents for special occasions.",
+)
+
 
 @dataclass
 class DesignElement:
@@ -108,109 +176,171 @@ class DesignDatabase:
             "collar": "design around the collar or neckline"
         }
 
+        # Reverse keyword indexes so preference analysis is a hash lookup per
+        # token instead of a substring scan over every keyword. Single-word
+        # keywords map token -> bucket name; multi-word keywords go into a
+        # short list that still needs a substring check.
+        self._style_index: Dict[str, str] = {}
+        self._color_index: Dict[str, str] = {}
+        self._theme_index: Dict[str, str] = {}
+        self._multiword_patterns: List[Tuple[str, str, str]] = []
+
+        for style, data in self.art_styles.items():
+            for keyword in (style, *data["patterns"]):
+                if " " in keyword:
+                    self._multiword_patterns.append((keyword, "styles", style))
+                else:
+                    self._style_index.setdefault(keyword, style)
+
+        for palette_name, colors in self.color_palettes.items():
+            for keyword in (palette_name, *colors):
+                if " " in keyword:
+                    self._multiword_patterns.append((keyword, "colors", palette_name))
+                else:
+                    self._color_index.setdefault(keyword, palette_name)
+
+        for theme, elements in self.themes.items():
+            for keyword in (theme, *elements):
+                if " " in keyword:
+                    self._multiword_patterns.append((keyword, "themes", theme))
+                else:
+                    self._theme_index.setdefault(keyword, theme)
+
+        # Frozen key/value sequences so suggestion generation doesn't rebuild
+        # a list from each dict on every random draw; random.choice accepts
+        # tuples directly
+        self.art_style_keys = tuple(self.art_styles)
+        self.color_palette_list = tuple(self.color_palettes.values())
+        self.theme_keys = tuple(self.themes)
+        self.placement_keys = tuple(self.placement_options)
+
+        # Bumped whenever the catalogs above mutate (they currently never do);
+        # keyed into the preference-analysis cache so stale entries can't leak
+        self.version = 0
+
+
+@functools.lru_cache(maxsize=512)
+def _analyze_preferences_cached(db: DesignDatabase, user_input: str,
+                                db_version: int) -> Tuple[tuple, tuple, tuple, str, str]:
+    """Analyze user input against a design database (cached on the raw query).
+
+    Returns immutable tuples so cached results can't be mutated by callers.
+    """
+    user_input_lower = user_input.lower()
+    tokens = set(_TOKEN_RE.findall(user_input_lower))
+
+    matched = {"styles": set(), "colors": set(), "themes": set()}
+
+    # Single-word keywords resolve through the reverse indexes
+    for token in tokens:
+        if token in db._style_index:
+            matched["styles"].add(db._style_index[token])
+        if token in db._color_index:
+            matched["colors"].add(db._color_index[token])
+        if token in db._theme_index:
+            matched["themes"].add(db._theme_index[token])
+
+    # Multi-word keywords still need a substring check, but the list is short
+    for phrase, category, bucket in db._multiword_patterns:
+        if phrase in user_input_lower:
+            matched[category].add(bucket)
+
+    styles = tuple(s for s in db.art_styles if s in matched["styles"])
+    themes = tuple(t for t in db.themes if t in matched["themes"])
+
+    # Take the first matching palette's first 3 colors
+    colors = ()
+    for palette_name, palette_colors in db.color_palettes.items():
+        if palette_name in matched["colors"]:
+            colors = tuple(palette_colors[:3])
+            break
+
+    complexity = "medium"
+    for level, words in _COMPLEXITY_WORDS.items():
+        if tokens & words:
+            complexity = level
+            break
+
+    vibe = "casual"
+    for name, words in _VIBE_WORDS.items():
+        if tokens & words:
+            vibe = name
+            break
+
+    return styles, colors, themes, complexity, vibe
+
 
 class DesignSuggestionEngine:
     """Generates creative design suggestions based on user input"""
     
     def __init__(self):
         self.design_db = DesignDatabase()
-        self.preference_history = []
+        # Bounded history; the deque drops the oldest entry for free
+        self.preference_history = deque(maxlen=10)
     
     def analyze_preferences(self, user_input: str) -> Dict[str, Any]:
         """Analyze user input to extract design preferences"""
-        user_input_lower = user_input.lower()
-        
-        preferences = {
-            "styles": [],
-            "colors": [],
-            "themes": [],
-            "complexity": "medium",
-            "vibe": "casual"
+        styles, colors, themes, complexity, vibe = _analyze_preferences_cached(
+            self.design_db, user_input, self.design_db.version
+        )
+
+        # Fresh containers so callers mutating the result don't poison the cache
+        return {
+            "styles": list(styles),
+            "colors": list(colors),
+            "themes": list(themes),
+            "complexity": complexity,
+            "vibe": vibe
         }
-        
-        # Detect art styles
-        for style, data in self.design_db.art_styles.items():
-            if style in user_input_lower or any(pattern in user_input_lower for pattern in data["patterns"]):
-                preferences["styles"].append(style)
-        
-        # Detect color preferences
-        for palette_name, colors in self.design_db.color_palettes.items():
-            if palette_name in user_input_lower or any(color in user_input_lower for color in colors):
-                preferences["colors"].extend(colors[:3])  # Take first 3 colors
-                break
-        
-        # Detect themes
-        for theme, elements in self.design_db.themes.items():
-            if theme in user_input_lower or any(element in user_input_lower for element in elements):
-                preferences["themes"].append(theme)
-        
-        # Detect complexity
-        if any(word in user_input_lower for word in ["simple", "minimal", "clean", "subtle"]):
-            preferences["complexity"] = "low"
-        elif any(word in user_input_lower for word in ["complex", "detailed", "intricate", "elaborate"]):
-            preferences["complexity"] = "high"
-        
-        # Detect vibe
-        if any(word in user_input_lower for word in ["bold", "loud", "striking", "dramatic"]):
-            preferences["vibe"] = "bold"
-        elif any(word in user_input_lower for word in ["elegant", "sophisticated", "classy", "refined"]):
-            preferences["vibe"] = "elegant"
-        elif any(word in user_input_lower for word in ["fun", "playful", "cute", "whimsical"]):
-            preferences["vibe"] = "playful"
-        
-        return preferences
     
     def generate_suggestions(self, user_input: str, garment_type: str = "t-shirt", 
                            num_suggestions: int = None) -> List[Dict[str, Any]]:
         """Generate design suggestions based on user input"""
         num_suggestions = num_suggestions or config.design_max_suggestions
         preferences = self.analyze_preferences(user_input)
-        
-        suggestions = []
-        
-        for i in range(num_suggestions):
-            suggestion = self._create_single_suggestion(preferences, garment_type, i)
-            suggestions.append(suggestion)
-        
-        return suggestions
-    
-    def _create_single_suggestion(self, preferences: Dict[str, Any], 
-                                garment_type: str, variation: int) -> Dict[str, Any]:
-        """Create a single design suggestion"""
-        
+
+        # Draw every random index for every suggestion in one C-level RNG
+        # pass; each draw is reduced modulo the target sequence length when
+        # it is spent in _create_single_suggestion
+        rng = np.random.default_rng()
+        draws = rng.integers(0, 2 ** 32, size=(num_suggestions, 6))
+
+        return [
+            self._create_single_suggestion(preferences, garment_type, i, rng, draws[i])
+            for i in range(num_suggestions)
+        ]
+
+    def _create_single_suggestion(self, preferences: Dict[str, Any],
+                                garment_type: str, variation: int,
+                                rng: np.random.Generator, draws: np.ndarray) -> Dict[str, Any]:
+        """Create a single design suggestion from a row of precomputed draws"""
+        db = self.design_db
+
+        def pick(seq, draw):
+            return seq[int(draw) % len(seq)]
+
         # Select style
-        if preferences["styles"]:
-            style = random.choice(preferences["styles"])
-        else:
-            style = random.choice(list(self.design_db.art_styles.keys()))
-        
-        style_data = self.design_db.art_styles[style]
-        
+        style = pick(preferences["styles"] or db.art_style_keys, draws[0])
+        style_data = db.art_styles[style]
+
         # Select colors
-        if preferences["colors"]:
-            colors = random.sample(preferences["colors"], 
-                                 min(len(preferences["colors"]), 3))
-        else:
-            palette = random.choice(list(self.design_db.color_palettes.values()))
-            colors = random.sample(palette, min(len(palette), 3))
-        
+        color_pool = preferences["colors"] or pick(db.color_palette_list, draws[1])
+        chosen = rng.choice(len(color_pool), size=min(len(color_pool), 3), replace=False)
+        colors = [color_pool[j] for j in chosen]
+
         # Select theme
-        if preferences["themes"]:
-            theme = random.choice(preferences["themes"])
-            theme_elements = self.design_db.themes[theme]
-        else:
-            theme = random.choice(list(self.design_db.themes.keys()))
-            theme_elements = self.design_db.themes[theme]
-        
+        theme = pick(preferences["themes"] or db.theme_keys, draws[2])
+        theme_elements = db.themes[theme]
+
         # Select pattern
-        pattern = random.choice(style_data["patterns"])
-        
+        pattern = pick(style_data["patterns"], draws[3])
+
         # Select placement
-        placement_key = random.choice(list(self.design_db.placement_options.keys()))
-        placement = self.design_db.placement_options[placement_key]
-        
+        placement_key = pick(db.placement_keys, draws[4])
+        placement = db.placement_options[placement_key]
+
         # Select theme element
-        theme_element = random.choice(theme_elements)
+        theme_element = pick(theme_elements, draws[5])
         
         # Create description
         description = self._create_description(
@@ -245,44 +375,22 @@ class DesignSuggestionEngine:
         """Create a detailed description of the design"""
         
         color_desc = self._format_colors(colors)
-        
-        base_descriptions = [
-            f"A {vibe} {style} design featuring {theme_element} in {color_desc}",
-            f"Picture a {style}-inspired {theme_element} design using {color_desc}",
-            f"Imagine a {vibe} {pattern} pattern incorporating {theme_element} in {color_desc}",
-            f"A {complexity}-complexity {style} design with {theme_element} elements in {color_desc}"
-        ]
-        
-        base = random.choice(base_descriptions)
-        
+
+        base = _BASE_TEMPLATES[random.randrange(len(_BASE_TEMPLATES))].format(
+            vibe=vibe, style=style, theme_element=theme_element,
+            color_desc=color_desc, pattern=pattern, complexity=complexity
+        )
+
         # Add placement
         placement_desc = f", positioned {placement}"
-        
+
         # Add style details
-        if style == "geometric":
-            style_detail = " with clean, mathematical precision"
-        elif style == "organic":
-            style_detail = " with flowing, natural curves"
-        elif style == "vintage":
-            style_detail = " with classic, timeless appeal"
-        elif style == "grunge":
-            style_detail = " with a raw, edgy aesthetic"
-        elif style == "japanese":
-            style_detail = " with elegant Eastern influences"
-        else:
-            style_detail = f" with {self.design_db.art_styles[style]['description']}"
-        
+        style_detail = (_STYLE_DETAILS.get(style)
+                        or f" with {self.design_db.art_styles[style]['description']}")
+
         # Add finishing touches
-        finishing_options = [
-            ". This design would work beautifully with screen printing.",
-            ". Perfect for digital printing to capture all the color nuances.",
-            ". The design would look stunning with a subtle texture overlay.",
-            ". Consider adding a slight vintage wash effect for extra character.",
-            ". The design could be enhanced with metallic accents for special occasions."
-        ]
-        
-        finishing = random.choice(finishing_options)
-        
+        finishing = _FINISHING_OPTIONS[random.randrange(len(_FINISHING_OPTIONS))]
+
         return base + placement_desc + style_detail + finishing
     
     def _format_colors(self, colors: List[str]) -> str:
@@ -296,14 +404,11 @@ class DesignSuggestionEngine:
     
     def _suggest_print_method(self, style: str, num_colors: int, complexity: str) -> str:
         """Suggest the best printing method for the design"""
-        if num_colors <= 2 and complexity == "low":
-            return "screen printing"
-        elif num_colors > 4 or complexity == "high":
-            return "digital printing"
-        elif style in ["vintage", "grunge"]:
-            return "heat transfer"
-        else:
-            return "screen printing"
+        color_bucket = 0 if num_colors <= 2 else 2 if num_colors > 4 else 1
+        style_bucket = "rough" if style in _ROUGH_STYLES else "other"
+        if complexity not in ("low", "high"):
+            complexity = "medium"
+        return _PRINT_TABLE[(color_bucket, complexity, style_bucket)]
     
     def refine_suggestion(self, suggestion: Dict[str, Any], 
                          feedback: str) -> Dict[str, Any]:
@@ -367,11 +472,16 @@ class DesignSuggestionEngine:
         preferences = self.analyze_preferences(user_input)
         preferences["selected_suggestion"] = selected_suggestion
         self.preference_history.append(preferences)
-        
-        # Keep only last 10 preferences
-        if len(self.preference_history) > 10:
-            self.preference_history = self.preference_history[-10:]
 
 
-# Singleton instance
-design_engine = DesignSuggestionEngine() 
\ No newline at end of file
+# Lazy singleton instance (PEP 562): created on first attribute access
+_design_engine = None
+
+
+def __getattr__(name):
+    if name == "design_engine":
+        global _design_engine
+        if _design_engine is None:
+            _design_engine = DesignSuggestionEngine()
+        return _design_engine
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}") 
\ No newline at end of file
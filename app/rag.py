@@ -4,24 +4,63 @@ Handles document loading, embedding, and retrieval for the knowledge base.
 """
 
 import os
+import re
 import json
 import logging
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
 import numpy as np
+import torch
 from sentence_transformers import SentenceTransformer
 import faiss
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 from langchain_community.document_loaders import TextLoader
-import markdown
 
 from config import config
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Precompiled markdown-syntax strippers; the old markdown -> HTML ->
+# strip-tags round trip only existed to recover plain text, which these do
+# directly. Links and images keep their text, inline markers are dropped.
+_MD_LINK_RE = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_MD_RE = re.compile(r"(^#{1,6}\s+|[*_`]{1,3})", re.M)
+
+
+def _loader_workers() -> int:
+    """Thread count for I/O-bound knowledge base loading"""
+    return min(8, (os.cpu_count() or 1) * 2)
+
+
+# (label, key, default, mode) rows describing one line of a product document
+_PRODUCT_FIELDS = (
+    ("Product", "name", "Unknown", "scalar"),
+    ("ID", "id", "N/A", "scalar"),
+    ("Category", "category", "N/A", "scalar"),
+    ("Price", "base_price", "N/A", "price"),
+    ("Description", "description", "N/A", "scalar"),
+    ("Sizes Available", "sizes", (), "list"),
+    ("Colors Available", "colors", (), "list"),
+    ("Materials", "materials", (), "list"),
+    ("Features", "features", (), "list"),
+    ("Customization Options", "customization_options", (), "list"),
+    ("Stock Status", "stock_status", "N/A", "scalar"),
+    ("Lead Time", "lead_time", "N/A", "scalar"),
+)
+
+
+def _format_product_field(label: str, value, mode: str) -> str:
+    if mode == "list":
+        return f"{label}: {', '.join(value)}"
+    if mode == "price":
+        return f"{label}: ${value}"
+    return f"{label}: {value}"
+
 
 class DocumentProcessor:
     """Handles loading and processing of knowledge base documents"""
@@ -33,70 +72,82 @@ class DocumentProcessor:
             separators=["\n\n", "\n", ". ", " ", ""]
         )
     
+    def _load_one_markdown(self, path: str, name: str) -> Optional[Document]:
+        """Load and process a single markdown file"""
+        try:
+            content = Path(path).read_text(encoding='utf-8')
+
+            # Strip markdown syntax to plain text for better processing
+            text = _MD_RE.sub('', _MD_LINK_RE.sub(r'\1', content))
+
+            doc = Document(
+                page_content=text,
+                metadata={
+                    "source": path,
+                    "type": "markdown",
+                    "filename": name
+                }
+            )
+            logger.info(f"Loaded markdown file: {name}")
+            return doc
+
+        except Exception as e:
+            logger.error(f"Error loading {path}: {str(e)}")
+            return None
+
     def load_markdown_files(self, directory: str) -> List[Document]:
         """Load and process markdown files"""
-        documents = []
-        kb_path = Path(directory)
-        
-        for md_file in kb_path.glob("*.md"):
-            try:
-                with open(md_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Convert markdown to plain text for better processing
-                html = markdown.markdown(content)
-                # Simple HTML tag removal
-                import re
-                text = re.sub('<[^<]+?>', '', html)
-                
-                doc = Document(
-                    page_content=text,
+        # os.scandir avoids the per-entry stat calls Path.glob makes
+        md_files = [(entry.path, entry.name) for entry in os.scandir(directory)
+                    if entry.name.endswith(".md")]
+        if not md_files:
+            return []
+
+        # Per-file loads are independent, so overlap the disk reads
+        with ThreadPoolExecutor(max_workers=_loader_workers()) as executor:
+            loaded = executor.map(self._load_one_markdown, *zip(*md_files))
+
+        return [doc for doc in loaded if doc is not None]
+
+    def _load_one_json(self, path: str, name: str) -> List[Document]:
+        """Load and process a single JSON file"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            # Process different JSON structures
+            if name == "products.json":
+                documents = self._process_products_json(data, path)
+            else:
+                # Generic JSON processing
+                content = json.dumps(data, indent=2)
+                documents = [Document(
+                    page_content=content,
                     metadata={
-                        "source": str(md_file),
-                        "type": "markdown",
-                        "filename": md_file.name
+                        "source": path,
+                        "type": "json",
+                        "filename": name
                     }
-                )
-                documents.append(doc)
-                logger.info(f"Loaded markdown file: {md_file.name}")
-                
-            except Exception as e:
-                logger.error(f"Error loading {md_file}: {str(e)}")
-        
-        return documents
-    
+                )]
+
+            logger.info(f"Loaded JSON file: {name}")
+            return documents
+
+        except Exception as e:
+            logger.error(f"Error loading {path}: {str(e)}")
+            return []
+
     def load_json_files(self, directory: str) -> List[Document]:
         """Load and process JSON files"""
-        documents = []
-        kb_path = Path(directory)
-        
-        for json_file in kb_path.glob("*.json"):
-            try:
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Process different JSON structures
-                if json_file.name == "products.json":
-                    documents.extend(self._process_products_json(data, str(json_file)))
-                else:
-                    # Generic JSON processing
-                    content = json.dumps(data, indent=2)
-                    doc = Document(
-                        page_content=content,
-                        metadata={
-                            "source": str(json_file),
-                            "type": "json",
-                            "filename": json_file.name
-                        }
-                    )
-                    documents.append(doc)
-                
-                logger.info(f"Loaded JSON file: {json_file.name}")
-                
-            except Exception as e:
-                logger.error(f"Error loading {json_file}: {str(e)}")
-        
-        return documents
+        json_files = [(entry.path, entry.name) for entry in os.scandir(directory)
+                      if entry.name.endswith(".json")]
+        if not json_files:
+            return []
+
+        with ThreadPoolExecutor(max_workers=_loader_workers()) as executor:
+            loaded = executor.map(self._load_one_json, *zip(*json_files))
+
+        return [doc for docs in loaded for doc in docs]
     
     def _process_products_json(self, data: Dict, source: str) -> List[Document]:
         """Process products.json into individual product documents"""
@@ -104,22 +155,12 @@ class DocumentProcessor:
         
         if "products" in data:
             for product in data["products"]:
-                # Create a readable product description
-                content = f"""
-Product: {product.get('name', 'Unknown')}
-ID: {product.get('id', 'N/A')}
-Category: {product.get('category', 'N/A')}
-Price: ${product.get('base_price', 'N/A')}
-Description: {product.get('description', 'N/A')}
-Sizes Available: {', '.join(product.get('sizes', []))}
-Colors Available: {', '.join(product.get('colors', []))}
-Materials: {', '.join(product.get('materials', []))}
-Features: {', '.join(product.get('features', []))}
-Customization Options: {', '.join(product.get('customization_options', []))}
-Stock Status: {product.get('stock_status', 'N/A')}
-Lead Time: {product.get('lead_time', 'N/A')}
-                """.strip()
-                
+                # Create a readable product description from the field table
+                content = "\n".join(
+                    _format_product_field(label, product.get(key, default), mode)
+                    for label, key, default, mode in _PRODUCT_FIELDS
+                )
+
                 doc = Document(
                     page_content=content,
                     metadata={
@@ -161,16 +202,117 @@ Rush Order Lead Time: {custom_info.get('rush_order', {}).get('lead_time', 'N/A')
         """Split documents into smaller chunks"""
         return self.text_splitter.split_documents(documents)
 
+    def stream_chunks(self, documents: List[Document], batch_size: int = 128):
+        """Yield (texts, metadatas) batches of split chunks.
+
+        Streams pieces straight from the splitter so the fully chunked
+        corpus never has to exist in memory alongside its embeddings.
+        """
+        texts, metadatas = [], []
+        for doc in documents:
+            for piece in self.text_splitter.split_text(doc.page_content):
+                texts.append(piece)
+                # Copy per chunk so mutating one search hit's metadata
+                # can't leak into sibling chunks or the source document
+                metadatas.append(dict(doc.metadata))
+                if len(texts) == batch_size:
+                    yield texts, metadatas
+                    texts, metadatas = [], []
+        if texts:
+            yield texts, metadatas
+
+
+# Number of normalized query embeddings kept in the per-store LRU cache
+_QUERY_CACHE_SIZE = 256
+
+# Corpus size at which the flat index is swapped for an HNSW graph
+_HNSW_MIN_DOCS = 1000
+
+# Corpus size below which multi-process encoding costs more than it saves
+_MULTIPROCESS_MIN_TEXTS = 256
+
+
+def _best_device() -> str:
+    """Pick the fastest available device for the embedding model"""
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def _make_index(dimension: int, num_docs: int) -> "faiss.Index":
+    """Pick a FAISS index type for the corpus size.
+
+    Small corpora use an exact flat inner-product scan. Beyond
+    _HNSW_MIN_DOCS documents an HNSW graph gives near-exact recall with
+    sub-linear search instead of a full scan of every vector per query.
+    """
+    if num_docs >= _HNSW_MIN_DOCS:
+        index = faiss.IndexHNSWFlat(dimension, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 200
+        return index
+    return faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
+
 
 class VectorStore:
     """Handles vector embeddings and similarity search"""
-    
+
     def __init__(self):
-        self.embeddings_model = SentenceTransformer(config.embedding_model)
+        # The transformer is loaded lazily so constructing a VectorStore
+        # (and importing this module) doesn't pay the model-load cost
+        self._embeddings_model = None
         self.index = None
         self.documents = []
         self.embeddings = None
+        self.type_ids = {}
+        self.faq_ids = []
+        self._query_cache = OrderedDict()
+
+    @property
+    def embeddings_model(self) -> SentenceTransformer:
+        """The embedding model, loaded on first use"""
+        if self._embeddings_model is None:
+            self._embeddings_model = SentenceTransformer(
+                config.embedding_model, device=_best_device()
+            )
+        return self._embeddings_model
+
+    def _build_doc_id_maps(self) -> None:
+        """Record per-type and FAQ document id subsets for targeted search"""
+        type_ids = {}
+        faq_ids = []
+        for i, doc in enumerate(self.documents):
+            type_ids.setdefault(doc.metadata.get("type", "unknown"), []).append(i)
+            if "faq" in doc.metadata.get("filename", "").lower():
+                faq_ids.append(i)
+        self.type_ids = {t: np.asarray(ids, dtype=np.int64) for t, ids in type_ids.items()}
+        self.faq_ids = faq_ids
     
+    def _encode_corpus(self, texts: List[str], pool=None) -> np.ndarray:
+        """Encode a corpus in batches, normalized in the same pass.
+
+        On a multi-core CPU with a large enough corpus the batches are
+        spread across a worker-process pool; on GPU (or for small corpora,
+        where process startup costs more than it saves) a single batched
+        encode is used. Callers encoding many slices (the streaming index
+        build) pass a running pool to amortize its startup.
+        """
+        model = self.embeddings_model
+        if pool is not None:
+            embeddings = model.encode_multi_process(
+                texts, pool, batch_size=64, normalize_embeddings=True
+            )
+            return np.asarray(embeddings, dtype="float32")
+
+        if _best_device() == "cpu" and len(texts) >= _MULTIPROCESS_MIN_TEXTS:
+            pool = model.start_multi_process_pool()
+            try:
+                return self._encode_corpus(texts, pool=pool)
+            finally:
+                model.stop_multi_process_pool(pool)
+
+        return model.encode(
+            texts, batch_size=64, convert_to_numpy=True,
+            normalize_embeddings=True, show_progress_bar=False
+        ).astype("float32")
+
     def build_index(self, documents: List[Document]) -> None:
         """Build FAISS index from documents"""
         logger.info("Building vector index...")
@@ -179,67 +321,213 @@ class VectorStore:
         texts = [doc.page_content for doc in documents]
         
         # Generate embeddings
-        self.embeddings = self.embeddings_model.encode(texts)
-        
+        self.embeddings = self._encode_corpus(texts)
+
         # Build FAISS index
         dimension = self.embeddings.shape[1]
-        self.index = faiss.IndexFlatIP(dimension)  # Inner product for cosine similarity
-        
-        # Normalize embeddings for cosine similarity
-        faiss.normalize_L2(self.embeddings)
+        self.index = _make_index(dimension, len(documents))
         self.index.add(self.embeddings)
-        
+
+        self._build_doc_id_maps()
+
         logger.info(f"Built index with {len(documents)} documents")
     
-    def similarity_search(self, query: str, k: int = None) -> List[Dict[str, Any]]:
-        """Search for similar documents"""
-        if self.index is None:
-            logger.error("Index not built. Call build_index first.")
-            return []
-        
-        k = k or config.top_k_results
-        
-        # Encode query
-        query_embedding = self.embeddings_model.encode([query])
-        faiss.normalize_L2(query_embedding)
-        
-        # Search
-        scores, indices = self.index.search(query_embedding, k)
-        
+    def _cache_query_embedding(self, query: str, embedding: np.ndarray) -> None:
+        """Insert a query embedding into the LRU cache, evicting the oldest entry"""
+        self._query_cache[query] = embedding
+        if len(self._query_cache) > _QUERY_CACHE_SIZE:
+            self._query_cache.popitem(last=False)
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Encode a query into a normalized embedding, using the LRU cache"""
+        cached = self._query_cache.get(query)
+        if cached is not None:
+            self._query_cache.move_to_end(query)
+            return cached
+
+        embedding = self.embeddings_model.encode([query])
+        faiss.normalize_L2(embedding)
+
+        self._cache_query_embedding(query, embedding)
+        return embedding
+
+    def _collect_results(self, scores, indices) -> List[Dict[str, Any]]:
+        """Convert one row of FAISS search output into result dicts"""
         results = []
-        for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
+        for i, (score, idx) in enumerate(zip(scores, indices)):
             if score >= config.similarity_threshold:
                 results.append({
                     "document": self.documents[idx],
                     "score": float(score),
                     "rank": i + 1
                 })
-        
         return results
+
+    def build_index_streaming(self, chunk_batches) -> None:
+        """Build the FAISS index from an iterator of (texts, metadatas) batches.
+
+        Each batch is encoded as it arrives, so peak memory holds one text
+        batch plus the accumulated embedding rows instead of every chunk
+        and the full embedding matrix at once.
+        """
+        logger.info("Building vector index...")
+
+        documents = []
+        embeddings = None
+        filled = 0
+        pool = None
+
+        try:
+            for texts, metadatas in chunk_batches:
+                # Once the corpus has proven large enough, start a worker
+                # pool and keep it running for the rest of the stream
+                if (pool is None and _best_device() == "cpu"
+                        and filled + len(texts) >= _MULTIPROCESS_MIN_TEXTS):
+                    pool = self.embeddings_model.start_multi_process_pool()
+
+                batch = self._encode_corpus(texts, pool=pool)
+
+                # Grow the preallocated matrix by doubling as batches land
+                if embeddings is None:
+                    embeddings = np.empty((max(1024, len(batch)), batch.shape[1]), dtype="float32")
+                while filled + len(batch) > len(embeddings):
+                    embeddings = np.resize(embeddings, (len(embeddings) * 2, embeddings.shape[1]))
+                embeddings[filled:filled + len(batch)] = batch
+                filled += len(batch)
+
+                documents.extend(
+                    Document(page_content=text, metadata=metadata)
+                    for text, metadata in zip(texts, metadatas)
+                )
+        finally:
+            if pool is not None:
+                self.embeddings_model.stop_multi_process_pool(pool)
+
+        if embeddings is None:
+            logger.error("No chunks to index.")
+            return
+
+        self.documents = documents
+        self.embeddings = embeddings[:filled]
+
+        dimension = self.embeddings.shape[1]
+        self.index = _make_index(dimension, len(documents))
+        self.index.add(self.embeddings)
+
+        self._build_doc_id_maps()
+
+        logger.info(f"Built index with {len(documents)} documents")
+
+    def similarity_search(self, query: str, k: int = None,
+                          doc_type: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Search for similar documents, optionally restricted to one document type"""
+        if self.index is None:
+            logger.error("Index not built. Call build_index first.")
+            return []
+
+        k = k or config.top_k_results
+
+        query_embedding = self._embed_query(query)
+
+        if doc_type is not None:
+            if doc_type not in self.type_ids:
+                return []
+            params = self._type_search_params(doc_type)
+            scores, indices = self.index.search(query_embedding, k, params=params)
+        else:
+            scores, indices = self.index.search(query_embedding, k)
+
+        return self._collect_results(scores[0], indices[0])
+
+    def _type_search_params(self, doc_type: str):
+        """Search params restricting the scan to one document type's ids.
+
+        The selector runs at the FAISS level instead of searching
+        everything and post-filtering; doc_type must exist in type_ids.
+        """
+        sel = faiss.IDSelectorBatch(self.type_ids[doc_type])
+        if isinstance(self.index, faiss.IndexHNSWFlat):
+            return faiss.SearchParametersHNSW(sel=sel)
+        return faiss.SearchParameters(sel=sel)
+
+    def batch_similarity_search(self, queries: List[str], k: int = None,
+                                doc_types: Optional[List[Optional[str]]] = None
+                                ) -> List[List[Dict[str, Any]]]:
+        """Search several queries in one pass, optionally typed per query.
+
+        Cache misses are encoded in a single batched forward pass; the
+        queries are then searched in groups sharing the same type filter,
+        since FAISS takes one selector per search call.
+        """
+        if self.index is None:
+            logger.error("Index not built. Call build_index first.")
+            return [[] for _ in queries]
+
+        k = k or config.top_k_results
+        doc_types = doc_types or [None] * len(queries)
+
+        # Encode cache misses in a single batched forward pass
+        misses = list(dict.fromkeys(q for q in queries if q not in self._query_cache))
+        if misses:
+            embeddings = self.embeddings_model.encode(
+                misses, batch_size=32, convert_to_numpy=True,
+                normalize_embeddings=True, show_progress_bar=False
+            ).astype("float32")
+            for query, embedding in zip(misses, embeddings):
+                self._cache_query_embedding(query, embedding[np.newaxis, :])
+
+        groups = {}
+        for row, doc_type in enumerate(doc_types):
+            groups.setdefault(doc_type, []).append(row)
+
+        all_results = [[] for _ in queries]
+        for doc_type, rows in groups.items():
+            stacked = np.vstack([self._embed_query(queries[row]) for row in rows])
+            if doc_type is not None:
+                if doc_type not in self.type_ids:
+                    continue
+                params = self._type_search_params(doc_type)
+                scores, indices = self.index.search(stacked, k, params=params)
+            else:
+                scores, indices = self.index.search(stacked, k)
+            for s, i, row in zip(scores, indices, rows):
+                all_results[row] = self._collect_results(s, i)
+
+        return all_results
     
     def save_index(self, path: str) -> None:
         """Save the FAISS index and documents"""
         os.makedirs(os.path.dirname(path), exist_ok=True)
         faiss.write_index(self.index, f"{path}.index")
         
-        # Save documents and embeddings
-        import pickle
-        with open(f"{path}.docs", 'wb') as f:
-            pickle.dump(self.documents, f)
-        
-        np.save(f"{path}.embeddings", self.embeddings)
+        # Save documents as JSONL: faster than pickle, smaller, and without
+        # pickle's arbitrary-code deserialization footgun
+        with open(f"{path}.docs.jsonl", 'w', encoding='utf-8') as f:
+            for doc in self.documents:
+                f.write(json.dumps({"c": doc.page_content, "m": doc.metadata}) + "\n")
+
+        # Half precision halves the on-disk matrix; embeddings are only
+        # needed again for rebuilds, never for search
+        np.save(f"{path}.embeddings", self.embeddings.astype(np.float16))
         logger.info(f"Saved index to {path}")
     
     def load_index(self, path: str) -> bool:
         """Load a pre-built FAISS index"""
         try:
-            self.index = faiss.read_index(f"{path}.index")
-            
-            import pickle
-            with open(f"{path}.docs", 'rb') as f:
-                self.documents = pickle.load(f)
-            
-            self.embeddings = np.load(f"{path}.embeddings.npy")
+            # Memory-map both files so pages are only faulted in on demand;
+            # the embedding matrix is never touched unless the index is rebuilt
+            self.index = faiss.read_index(
+                f"{path}.index", faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+            )
+
+            with open(f"{path}.docs.jsonl", 'r', encoding='utf-8') as f:
+                self.documents = [
+                    Document(page_content=record["c"], metadata=record["m"])
+                    for record in map(json.loads, f)
+                ]
+
+            self.embeddings = np.load(f"{path}.embeddings.npy", mmap_mode='r')
+            self._build_doc_id_maps()
             logger.info(f"Loaded index from {path}")
             return True
         except Exception as e:
@@ -269,22 +557,16 @@ class RAGSystem:
         # Build new index
         logger.info("Building new RAG index...")
         
-        # Load all documents
-        all_docs = []
-        
-        # Load markdown files
-        md_docs = self.doc_processor.load_markdown_files(self.kb_path)
-        all_docs.extend(md_docs)
-        
-        # Load JSON files
-        json_docs = self.doc_processor.load_json_files(self.kb_path)
-        all_docs.extend(json_docs)
+        # Load markdown and JSON files concurrently; they touch disjoint files
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            md_future = executor.submit(self.doc_processor.load_markdown_files, self.kb_path)
+            json_future = executor.submit(self.doc_processor.load_json_files, self.kb_path)
+            all_docs = md_future.result() + json_future.result()
         
-        # Split into chunks
-        chunked_docs = self.doc_processor.split_documents(all_docs)
-        
-        # Build vector index
-        self.vector_store.build_index(chunked_docs)
+        # Split and embed in one streaming pass instead of materializing
+        # the whole chunked corpus before encoding starts
+        chunk_batches = self.doc_processor.stream_chunks(all_docs)
+        self.vector_store.build_index_streaming(chunk_batches)
         
         # Save index
         self.vector_store.save_index(index_path)
@@ -292,71 +574,104 @@ class RAGSystem:
         self.is_initialized = True
         logger.info("RAG system initialization complete")
     
-    def get_relevant_context(self, query: str, max_context_length: int = 2000) -> str:
-        """Retrieve relevant context for a query"""
-        if not self.is_initialized:
-            self.initialize()
-        
-        results = self.vector_store.similarity_search(query)
-        
+    def _format_context(self, results: List[Dict[str, Any]],
+                        max_context_length: int) -> str:
+        """Combine search results into a bounded context string"""
         if not results:
             return "No relevant information found in the knowledge base."
-        
-        # Combine relevant documents
+
+        # Track the length budget from the component sizes so no strings
+        # are built just to be measured
+        sep = "\n---\n"
         context_parts = []
         total_length = 0
-        
+
         for result in results:
             doc = result["document"]
             content = doc.page_content
-            score = result["score"]
-            
-            # Add metadata for context
-            source_info = f"[Source: {doc.metadata.get('filename', 'unknown')}]"
-            content_with_source = f"{source_info}\n{content}\n"
-            
-            if total_length + len(content_with_source) > max_context_length:
+
+            source_line = f"[Source: {doc.metadata.get('filename', 'unknown')}]\n"
+            extra = len(source_line) + len(content) + 1
+            if context_parts:
+                extra += len(sep)
+
+            if total_length + extra > max_context_length:
                 break
-            
-            context_parts.append(content_with_source)
-            total_length += len(content_with_source)
-        
-        return "\n---\n".join(context_parts)
-    
+
+            context_parts.append((source_line, content))
+            total_length += extra
+
+        return sep.join(f"{source_line}{content}\n"
+                        for source_line, content in context_parts)
+
+    def _format_products(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Shape product search results for consumers"""
+        return [{
+            "product_id": result["document"].metadata.get("product_id"),
+            "content": result["document"].page_content,
+            "score": result["score"]
+        } for result in results]
+
+    def get_relevant_context(self, query: str, max_context_length: int = 2000) -> str:
+        """Retrieve relevant context for a query"""
+        if not self.is_initialized:
+            self.initialize()
+
+        results = self.vector_store.similarity_search(query)
+        return self._format_context(results, max_context_length)
+
     def search_products(self, query: str) -> List[Dict[str, Any]]:
         """Search specifically for products"""
         if not self.is_initialized:
             self.initialize()
-        
-        results = self.vector_store.similarity_search(query)
-        
-        # Filter for product documents
-        product_results = []
-        for result in results:
-            if result["document"].metadata.get("type") == "product":
-                product_results.append({
-                    "product_id": result["document"].metadata.get("product_id"),
-                    "content": result["document"].page_content,
-                    "score": result["score"]
-                })
-        
-        return product_results
+
+        # The type filter runs inside FAISS, so all k slots are products
+        results = self.vector_store.similarity_search(query, doc_type="product")
+        return self._format_products(results)
+
+    def get_context_and_products(self, query: str,
+                                 max_context_length: int = 2000) -> Tuple[str, List[Dict[str, Any]]]:
+        """Retrieve relevant context and product matches in one batched search"""
+        if not self.is_initialized:
+            self.initialize()
+
+        context_results, product_results = self.vector_store.batch_similarity_search(
+            [query, query], doc_types=[None, "product"]
+        )
+        return (self._format_context(context_results, max_context_length),
+                self._format_products(product_results))
     
     def get_faq_response(self, query: str) -> Optional[str]:
         """Get response from FAQ documents"""
         if not self.is_initialized:
             self.initialize()
-        
-        results = self.vector_store.similarity_search(query)
-        
-        # Look for FAQ content
-        for result in results:
-            doc = result["document"]
-            if "faq" in doc.metadata.get("filename", "").lower():
-                return doc.page_content
-        
-        return None
+
+        faq_ids = self.vector_store.faq_ids
+        if not faq_ids:
+            return None
+
+        # FAQ chunks are known by id, so score just those embedding rows
+        # against the query instead of searching the whole index
+        query_embedding = self.vector_store._embed_query(query)[0]
+        faq_rows = np.asarray(self.vector_store.embeddings[faq_ids], dtype="float32")
+        scores = faq_rows @ query_embedding
+
+        best = int(np.argmax(scores))
+        if scores[best] < config.similarity_threshold:
+            return None
+
+        return self.vector_store.documents[faq_ids[best]].page_content
+
+
+# Lazy singleton instance (PEP 562): created on first attribute access so
+# importing this module stays cheap for code paths that never query the RAG
+_rag_system = None
 
 
-# Singleton instance
-rag_system = RAGSystem() 
\ No newline at end of file
+def __getattr__(name):
+    if name == "rag_system":
+        global _rag_system
+        if _rag_system is None:
+            _rag_system = RAGSystem()
+        return _rag_system
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}") 
\ No newline at end of file